@@ -1,10 +1,14 @@
-import logging
 import asyncio
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import uvicorn
-import threading
-import time
-import signal
-import sys
+try:
+    import uvloop
+except ImportError:
+    # uvloop does not support Windows; fall back to the default asyncio loop there
+    uvloop = None
 from typing import Dict
 from simple_naptha_mcp.schemas import InputSchema
 from naptha_sdk.schemas import AgentRunInput
@@ -12,59 +16,63 @@ from simple_naptha_mcp.server import mcp_fetcher
 
 logger = logging.getLogger(__name__)
 
-# Server management
-server_instance = None
-server_thread = None
-keep_running = True
-
-def signal_handler(sig, frame):
-    """Handle Ctrl+C to gracefully shut down the server"""
-    global keep_running
-    print("\nShutting down server...")
-    keep_running = False
-    stop_server()
-    sys.exit(0)
-
-def start_server(port=8000):
-    """Start the MCP server in a separate thread"""
-    global server_instance, server_thread
-    
-    def run_server():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        starlette_app = mcp_fetcher.create_starlette_app(debug=True)
-        logger.info(f"Starting MCP server on port {port}")
-        config = uvicorn.Config(
-            starlette_app, 
-            host="0.0.0.0", 
-            port=port, 
-            log_level="info"
-        )
-        server_instance = uvicorn.Server(config)
-        loop.run_until_complete(server_instance.serve())
-    
-    # Use a non-daemon thread so it can keep running
-    server_thread = threading.Thread(target=run_server)
-    server_thread.daemon = False  # This is important - non-daemon threads keep the program running
-    server_thread.start()
-    logger.info(f"Server thread started, available at http://localhost:{port}/sse")
-    
-    # Give the server a moment to start
-    time.sleep(1)
-    return True
+_log_listeners = []
 
-def stop_server():
-    """Stop the MCP server if it's running"""
-    global server_instance, server_thread
-    
-    if server_instance:
-        server_instance.should_exit = True
-        logger.info("Server shutdown initiated")
-    
-    if server_thread and server_thread.is_alive():
-        server_thread.join(timeout=5)
-        logger.info("Server thread stopped")
+def queue_log_handlers():
+    """Move the root logger's handlers onto a QueueListener thread, so logging from
+    coroutines only enqueues and the stream writes happen off the event loop"""
+    root = logging.getLogger()
+    handlers = [h for h in root.handlers if not isinstance(h, QueueHandler)]
+    if not handlers:
+        if root.handlers:
+            # Already queued by an earlier run
+            return
+        handlers = [logging.StreamHandler()]
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _log_listeners.append(listener)
+    root.handlers = [h for h in root.handlers if isinstance(h, QueueHandler)]
+    root.addHandler(QueueHandler(log_queue))
+
+@atexit.register
+def _stop_log_listeners():
+    # Flush anything still queued before the interpreter exits
+    while _log_listeners:
+        _log_listeners.pop().stop()
+
+class ReadyServer(uvicorn.Server):
+    """uvicorn server that logs its URL once its sockets are bound"""
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            logger.info("MCP server ready, available at http://localhost:%d/sse", self.config.port)
+
+async def run_async(module_run: AgentRunInput) -> bool:
+    """Serve the MCP server on the running event loop until uvicorn exits.
+    Returns whether the server managed to start."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Received input: %r", module_run.inputs)
+
+    port = module_run.inputs.port
+
+    starlette_app = mcp_fetcher.create_starlette_app(debug=True)
+    logger.info("Starting MCP server on port %d", port)
+    config = uvicorn.Config(
+        starlette_app, 
+        host="0.0.0.0", 
+        port=port, 
+        log_level="info",
+        # C parser for HTTP; MCP only uses SSE + POST, so websockets stay off
+        http="httptools",
+        ws="none",
+        interface="asgi3",
+    )
+    server = ReadyServer(config)
+    # uvicorn installs its own SIGINT/SIGTERM handlers for graceful shutdown
+    await server.serve()
+    return server.started
 
 def run(module_run: Dict, *args, **kwargs):
     """Main entry point for the agent"""
@@ -72,30 +80,33 @@ def run(module_run: Dict, *args, **kwargs):
         # Parse the input
         module_run = AgentRunInput(**module_run)
         module_run.inputs = InputSchema(**module_run.inputs)
-        logger.info(f"Received input: {module_run.inputs}")
 
         port = module_run.inputs.port
-        
-        # Start the MCP server if it's not already running
-        if not server_thread or not server_thread.is_alive():
-            success = start_server(port)
-            if success:
-                logger.info("MCP server started for this run")
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Failed to start MCP server on port {port}"
-                }
-        
+
+        queue_log_handlers()
+        try:
+            runner = uvloop.run if uvloop is not None else asyncio.run
+            started = runner(run_async(module_run))
+        except KeyboardInterrupt:
+            # uvicorn shuts down gracefully on Ctrl+C, then re-raises the captured SIGINT
+            print("\nShutting down server...")
+            started = True
+        except SystemExit:
+            # uvicorn calls sys.exit(1) when it cannot bind the port
+            started = False
+
+        if not started:
+            logger.error("Failed to start MCP server on port %d", port)
+            return {
+                "status": "error",
+                "message": f"Failed to start MCP server on port {port}"
+            }
         return {
             "status": "success", 
-            "message": f"MCP server started for this run on port {port}"
+            "message": f"MCP server on port {port} stopped"
         }
-    
     except Exception as e:
-        logger.error(f"Error in run function: {e}", exc_info=True)
-        # Make sure to stop the server if there's an error
-        stop_server()
+        logger.error("Error in run function: %s", e, exc_info=True)
         raise
 
 if __name__ == "__main__":
@@ -104,9 +115,6 @@ if __name__ == "__main__":
     from naptha_sdk.configs import setup_module_deployment
     from naptha_sdk.client.naptha import Naptha
     
-    # Set up signal handler for Ctrl+C
-    signal.signal(signal.SIGINT, signal_handler)
-    
     naptha = Naptha()
 
     deployment = asyncio.run(setup_module_deployment("agent", "simple_naptha_mcp/configs/deployment.json", node_url = os.getenv("NODE_URL")))
@@ -122,15 +130,6 @@ if __name__ == "__main__":
         "signature": "ccccc"
     }
 
+    print("\nServer is running. Press Ctrl+C to stop.")
     response = run(module_run)
     print("Response: ", response)
-    
-    # Keep the main thread alive to prevent the program from exiting
-    print("\nServer is running. Press Ctrl+C to stop.")
-    try:
-        # This loop keeps the main thread alive while the server runs
-        while keep_running:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\nShutting down server...")
-        stop_server()
\ No newline at end of file
@@ -1,3 +1,9 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional
+import fastjsonschema
 import httpx
 import mcp.types as types
 from starlette.applications import Starlette
@@ -9,89 +15,200 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class _CachedPage(NamedTuple):
+    expires_at: float
+    etag: Optional[str]
+    text: str
+
+def _cache_lifetime(cache_control: str, default: float) -> Optional[float]:
+    """Seconds a response may be served from cache, or None if it must not be stored"""
+    lifetime = default
+    for directive in cache_control.lower().split(","):
+        directive = directive.strip()
+        if directive == "no-store":
+            return None
+        if directive == "no-cache":
+            lifetime = 0.0
+        elif directive.startswith("max-age="):
+            try:
+                lifetime = float(directive[len("max-age="):])
+            except ValueError:
+                pass
+    return lifetime
+
+FETCH_HEADERS = {
+    "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
+}
+
+FETCH_INPUT_SCHEMA = {
+    "type": "object",
+    "required": ["url"],
+    "properties": {
+        "url": {
+            "type": "string",
+            "description": "URL to fetch",
+        },
+        "raw": {
+            "type": "boolean",
+            "description": "Decode the body as UTF-8 without consulting the response charset (defaults to false)",
+        },
+    },
+}
+
+ECHO_INPUT_SCHEMA = {
+    "type": "object",
+    "required": ["message"],
+    "properties": {
+        "message": {
+            "type": "string",
+            "description": "Message to echo back",
+        }
+    },
+}
+
+HELLO_INPUT_SCHEMA = {
+    "type": "object",
+    "required": [],
+    "properties": {
+        "name": {
+            "type": "string",
+            "description": "Name to greet (defaults to 'World')",
+        }
+    },
+}
+
 class MCPWebsiteFetcher:
+    # Outbound client tuning; short connect/pool timeouts fail fast on slow handshakes
+    http2: bool = True
+    timeout: httpx.Timeout = httpx.Timeout(connect=3.0, read=20.0, write=10.0, pool=2.0)
+    limits: httpx.Limits = httpx.Limits(
+        max_connections=1000,
+        max_keepalive_connections=100,
+        keepalive_expiry=15.0,
+    )
+    max_concurrent_fetches: int = 64
+    # In-process page cache; Cache-Control max-age overrides the default TTL
+    cache_ttl: float = 60.0
+    cache_max_entries: int = 1024
+
     def __init__(self):
         self.app = Server("mcp-website-fetcher")
+        # Created per serving lifespan (see lifespan()), since both are bound to the running loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._fetch_sem: Optional[asyncio.Semaphore] = None
+        self._cache: OrderedDict[tuple[str, bool], _CachedPage] = OrderedDict()
+        # Tool metadata is static, so build it once rather than on every listing
+        self._tool_list = (
+            types.Tool(
+                name="fetch",
+                description="Fetches a website and returns its content",
+                inputSchema=FETCH_INPUT_SCHEMA,
+            ),
+            types.Tool(
+                name="echo",
+                description="Returns the provided message",
+                inputSchema=ECHO_INPUT_SCHEMA,
+            ),
+            types.Tool(
+                name="hello",
+                description="Returns a greeting message",
+                inputSchema=HELLO_INPUT_SCHEMA,
+            ),
+        )
+        # Compiled once per tool; raises JsonSchemaValueException (a ValueError) on bad arguments
+        self._validators = {tool.name: fastjsonschema.compile(tool.inputSchema) for tool in self._tool_list}
+        self._tool_handlers = {
+            "fetch": self._do_fetch,
+            "echo": self._do_echo,
+            "hello": self._do_hello,
+        }
         self.setup_tools()
+        # Static for the server's lifetime, so build once instead of per SSE connection
+        self._init_opts = self.app.create_initialization_options()
         
-    async def fetch_website(self, url: str) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-        headers = {
-            "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
-        }
-        async with httpx.AsyncClient(follow_redirects=True, headers=headers) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return [types.TextContent(type="text", text=response.text)]
+    async def fetch_website(self, url: str, raw: bool = False) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        key = (url, raw)
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry.expires_at:
+            self._cache.move_to_end(key)
+            return [types.TextContent(type="text", text=entry.text)]
+
+        # Revalidate a stale entry instead of re-downloading it when we have an ETag
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else None
+        async with self._fetch_sem:
+            async with self._client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and entry is not None:
+                    # The cached body is still current, and so is its validator
+                    text = entry.text
+                    etag = response.headers.get("ETag") or entry.etag
+                else:
+                    response.raise_for_status()
+                    # Stream the body into one buffer and decode once, instead of holding
+                    # the bytes alongside the decoded str via response.text
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                    encoding = "utf-8" if raw else response.encoding or "utf-8"
+                    text = body.decode(encoding, errors="replace")
+                    etag = response.headers.get("ETag")
+
+        lifetime = _cache_lifetime(response.headers.get("Cache-Control", ""), self.cache_ttl)
+        if lifetime is None:
+            self._cache.pop(key, None)
+        else:
+            self._cache[key] = _CachedPage(time.monotonic() + lifetime, etag, text)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+        return [types.TextContent(type="text", text=text)]
+
+    @asynccontextmanager
+    async def lifespan(self, app: Starlette) -> AsyncIterator[None]:
+        """Open the shared fetch client for the lifetime of one served Starlette app"""
+        # Shared client so repeated fetches reuse pooled TCP/TLS connections
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            headers=FETCH_HEADERS,
+            limits=self.limits,
+            timeout=self.timeout,
+            http2=self.http2,
+        )
+        # Caps in-flight outbound fetches so concurrent clients queue here, not inside the pool
+        self._fetch_sem = asyncio.Semaphore(self.max_concurrent_fetches)
+        try:
+            yield
+        finally:
+            await self._client.aclose()
+            self._client = None
+            self._fetch_sem = None
 
     async def echo_message(self, message: str) -> list[types.TextContent]:
         return [types.TextContent(type="text", text=message)]
 
     async def say_hello(self, name: str = "World") -> list[types.TextContent]:
         return [types.TextContent(type="text", text=f"Hello, {name}!")]
+
+    async def _do_fetch(self, arguments: dict) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        return await self.fetch_website(arguments["url"], raw=arguments.get("raw", False))
+
+    async def _do_echo(self, arguments: dict) -> list[types.TextContent]:
+        return await self.echo_message(arguments["message"])
+
+    async def _do_hello(self, arguments: dict) -> list[types.TextContent]:
+        return await self.say_hello(arguments.get("name", "World"))
     
     def setup_tools(self):
         @self.app.call_tool()
         async def fetch_tool(name: str, arguments: dict) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-            if name == "fetch":
-                if "url" not in arguments:
-                    raise ValueError("Missing required argument 'url'")
-                return await self.fetch_website(arguments["url"])
-            elif name == "echo":
-                if "message" not in arguments:
-                    raise ValueError("Missing required argument 'message'")
-                return await self.echo_message(arguments["message"])
-            elif name == "hello":
-                name_arg = arguments.get("name", "World")
-                return await self.say_hello(name_arg)
-            else:
+            handler = self._tool_handlers.get(name)
+            if handler is None:
                 raise ValueError(f"Unknown tool: {name}")
+            self._validators[name](arguments)
+            return await handler(arguments)
 
         @self.app.list_tools()
         async def list_tools() -> list[types.Tool]:
-            return [
-                types.Tool(
-                    name="fetch",
-                    description="Fetches a website and returns its content",
-                    inputSchema={
-                        "type": "object",
-                        "required": ["url"],
-                        "properties": {
-                            "url": {
-                                "type": "string",
-                                "description": "URL to fetch",
-                            }
-                        },
-                    },
-                ),
-                types.Tool(
-                    name="echo",
-                    description="Returns the provided message",
-                    inputSchema={
-                        "type": "object",
-                        "required": ["message"],
-                        "properties": {
-                            "message": {
-                                "type": "string",
-                                "description": "Message to echo back",
-                            }
-                        },
-                    },
-                ),
-                types.Tool(
-                    name="hello",
-                    description="Returns a greeting message",
-                    inputSchema={
-                        "type": "object",
-                        "required": [],
-                        "properties": {
-                            "name": {
-                                "type": "string",
-                                "description": "Name to greet (defaults to 'World')",
-                            }
-                        },
-                    },
-                )
-            ]
+            return list(self._tool_list)
     
     def create_starlette_app(self, debug: bool = False) -> Starlette:
         """Create a Starlette application that can serve the provided mcp server with SSE."""
@@ -106,7 +223,7 @@ class MCPWebsiteFetcher:
                 await self.app.run(
                     read_stream,
                     write_stream,
-                    self.app.create_initialization_options(),
+                    self._init_opts,
                 )
 
         return Starlette(
@@ -115,6 +232,7 @@ class MCPWebsiteFetcher:
                 Route("/sse", endpoint=handle_sse),
                 Mount("/messages/", app=sse.handle_post_message),
             ],
+            lifespan=self.lifespan,
         )
 
 # Create a singleton instance to be imported by run.py